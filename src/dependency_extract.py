@@ -1,54 +1,123 @@
-import toml
-import json
+import codecs
 import os
+import re
 import sys
-from typing import Set
-
-from yarnlock import yarnlock_parse
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, Set, Tuple
+
+# Parser libraries are imported inside the extractor that needs them, so a run
+# only pays the import cost for the one lock file format it is handling
+
+# A dependency as (name, version); formatted as name==version only for output
+Dep = Tuple[str, str]
+
+_NODE_MODULES = "node_modules/"
+_NODE_MODULES_LEN = len(_NODE_MODULES)
+_NPM_MARKER = "@npm:"
+
+_UTF8_BOM = codecs.BOM_UTF8
+
+# Pinned requirement line: name[extras]==version, ignoring trailing markers/comments
+_REQ_RE = re.compile(rb"[ \t]*([A-Za-z0-9._-]+)(?:\[[^\]\n]*\])?[ \t]*==[ \t]*([^\s;#]+)")
+
+# go.mod: strip // comments, then read `require (...)` blocks and single-line requires
+_GO_COMMENT_RE = re.compile(rb"//[^\n]*")
+_GO_REQUIRE_BLOCK_RE = re.compile(rb"(?m)^[ \t]*require[ \t]*\(([^)]*)\)")
+_GO_REQUIRE_LINE_RE = re.compile(rb"(?m)^[ \t]*require[ \t]+(\S+)[ \t]+([vV]\S*)")
+_GO_MODULE_RE = re.compile(rb"(?m)^[ \t]*(\S+)[ \t]+([vV]\S*)")
+
+# name/version keys of a [[package]] table, without crossing into the next table header
+_TOML_PKG_RE = re.compile(
+    rb'^\[\[package\]\]'
+    rb'(?:(?!^\[).)*?^name[ \t]*=[ \t]*"([^"\n]+)"'
+    rb'(?:(?!^\[).)*?^version[ \t]*=[ \t]*"([^"\n]+)"',
+    re.MULTILINE | re.DOTALL,
+)
+_TOML_PKG_HEADER_RE = re.compile(rb"(?m)^\[\[package\]\]")
+
+# Yield (name, version) for every package in a poetry/uv lock file
+def _iter_toml(path: str) -> Iterator[Dep]:
+    with open(path, "rb") as f:
+        data = f.read().removeprefix(_UTF8_BOM)
+
+    # Lock files only need name/version per [[package]], so scan for those directly.
+    # The scan is only trusted if it matched every [[package]] header; otherwise a
+    # package with keys it does not recognise would be dropped without a check.
+    pairs = _TOML_PKG_RE.findall(data)
+    if pairs and len(pairs) == len(_TOML_PKG_HEADER_RE.findall(data)):
+        for name, version in pairs:
+            yield sys.intern(name.decode()), sys.intern(version.decode())
+        return
+
+    # Layout the scanner does not fully recognise: fall back to a full TOML parse
+    try:
+        import tomllib
+    except ImportError:  # Python < 3.11
+        import tomli as tomllib
+
+    packages = tomllib.loads(data.decode("utf-8")).get("package", []) or []
+    for pkg in packages:
+        if pkg.get("name") and pkg.get("version"):
+            yield sys.intern(pkg["name"]), sys.intern(pkg["version"])
 
 # TOML extractor for poetry and uv
-def _extract_toml(path: str) -> Set[str]:
-    with open(path, "r") as f:
-        packages = toml.load(f).get("package", []) or []
-    return {
-        f"{pkg['name']}=={pkg['version']}" 
-        for pkg in packages 
-        if pkg.get('name') and pkg.get('version')
-    }
+def _extract_toml(path: str) -> Set[Dep]:
+    return set(_iter_toml(path))
+
+# Only the entries of a poetry/uv lock file that are not already in base
+def _extract_toml_diff(path: str, base: Set[Dep]) -> Set[Dep]:
+    return {entry for entry in _iter_toml(path) if entry not in base}
 
 # Extract deps from poetry.lock
-def extract_poetry(path: str) -> Set[str]:
+def extract_poetry(path: str) -> Set[Dep]:
     return _extract_toml(path)
 
 # Extract deps from uv.lock
-def extract_uv(path: str) -> Set[str]:
+def extract_uv(path: str) -> Set[Dep]:
     return _extract_toml(path)
 
+# Yield (path, details) pairs from the "packages" map of a package-lock.json,
+# streaming with ijson when available instead of loading the whole document
+def _iter_npm_packages(f) -> Iterable[Tuple[str, Dict[str, Any]]]:
+    try:
+        import ijson
+    except ImportError:  # fall back to a full in-memory parse
+        pass
+    else:
+        return ijson.kvitems(f, "packages")
+
+    try:
+        from orjson import loads
+    except ImportError:
+        from json import loads
+    data = loads(f.read())
+    return (data.get("packages", {}) or {}).items()
+
 # Extract deps from package-lock.json
-def extract_npm(path: str) -> Set[str]:
-    with open(path, "r") as f:
-        data = json.load(f)
-    packages = data.get("packages", {})
-    result = set()
-    for pkg_path, details in packages.items():
-        if not pkg_path or "version" not in details:
-            continue
-        package_name = pkg_path
-        last_nm_idx = package_name.rfind("node_modules/")
-        if last_nm_idx != -1:
-            package_name = package_name[last_nm_idx + len("node_modules/"):]
+def extract_npm(path: str) -> Set[Dep]:
+    result: Set[Dep] = set()
+    with open(path, "rb") as f:
+        for pkg_path, details in _iter_npm_packages(f):
+            if not pkg_path or "version" not in details:
+                continue
+            package_name = pkg_path
+            last_nm_idx = package_name.rfind(_NODE_MODULES)
+            if last_nm_idx != -1:
+                package_name = package_name[last_nm_idx + _NODE_MODULES_LEN:]
 
-        result.add(f"{package_name}=={details['version']}")
+            result.add((sys.intern(package_name), sys.intern(details["version"])))
     return result
 
 
 # Extract deps from yarn.lock
-def extract_yarn(path: str) -> Set[str]:
+def extract_yarn(path: str) -> Set[Dep]:
+    from yarnlock import yarnlock_parse
+
     with open(path, "r", encoding="utf-8") as f:
         data = f.read()
 
     y = yarnlock_parse(data) or {}
-    deps: Set[str] = set()
+    deps: Set[Dep] = set()
 
     for key, value in y.items():
         if not value:
@@ -57,10 +126,9 @@ def extract_yarn(path: str) -> Set[str]:
         if not version:
             continue
 
-        first_selector = str(key).split(",")[0].strip().strip('"').strip('"')
-        npm_marker = "@npm:"
-        if npm_marker in first_selector:
-            name = first_selector.split(npm_marker, 1)[0]
+        first_selector = str(key).partition(",")[0].strip().strip("\"'")
+        if _NPM_MARKER in first_selector:
+            name = first_selector.partition(_NPM_MARKER)[0]
         else:
             at = first_selector.rfind("@")
             if at <= 0:
@@ -68,67 +136,34 @@ def extract_yarn(path: str) -> Set[str]:
             name = first_selector[:at]
 
         if name:
-            deps.add(f"{name}=={version}")
+            deps.add((name, version))
 
     return deps
 
 
 # Extract deps from requirements.txt
-def extract_requirements(path: str) -> Set[str]:
-    with open(path, "r") as f:
-        lines = f.readlines()
-
-    deps = set()
-    for line in lines:
-        line = line.strip()
-        if not line or line.startswith("#"):
-            continue
-        if "==" in line:
-            name, version = line.split("==", 1)
-            deps.add(f"{name.strip()}=={version.strip()}")
+def extract_requirements(path: str) -> Set[Dep]:
+    deps: Set[Dep] = set()
+    with open(path, "rb") as f:
+        # A UTF-8 BOM (Windows editors) must not hide the first pin
+        first_line = f.readline().removeprefix(_UTF8_BOM)
+        for line in chain((first_line,), f):
+            match = _REQ_RE.match(line)
+            if match:
+                name, version = match.groups()
+                deps.add((name.decode(), version.decode()))
     return deps
 
 
 # Extract deps from go.mod
-def extract_go(path: str) -> Set[str]:
-    with open(path, "r", encoding="utf-8") as f:
-        lines = f.readlines()
+def extract_go(path: str) -> Set[Dep]:
+    with open(path, "rb") as f:
+        data = _GO_COMMENT_RE.sub(b"", f.read().removeprefix(_UTF8_BOM))
 
-    deps: Set[str] = set()
-    in_require_block = False
-
-    for dep in lines:
-        line = dep.strip()
-
-        if not line or line.startswith("//"):
-            continue
-
-        if line.startswith("replace ") or line.startswith("exclude "):
-            continue
-
-        if line == "require (":
-            in_require_block = True
-            continue
-        if in_require_block and line == ")":
-            in_require_block = False
-            continue
-
-        if in_require_block:
-            parts = line.split()
-            if len(parts) >= 2:
-                module, version = parts[0], parts[1]
-                if version[0].lower() == "v":
-                    deps.add(f"{module}=={version}")
-            continue
-
-        if line.startswith("require "):
-            parts = line[len("require "):].split()
-            if len(parts) >= 2:
-                module, version = parts[0], parts[1]
-                if version[0].lower() == "v":
-                    deps.add(f"{module}=={version}")
-
-    return deps 
+    pairs = _GO_REQUIRE_LINE_RE.findall(data)
+    for block in _GO_REQUIRE_BLOCK_RE.findall(data):
+        pairs.extend(_GO_MODULE_RE.findall(block))
+    return {(module.decode(), version.decode()) for module, version in pairs}
 
 
 def main() -> None:
@@ -143,10 +178,15 @@ def main() -> None:
         print(f"WARNING: {base_path} does not exists, creating empty diff.")
         sys.exit(1)
 
+    # Extractors that can diff against the base set while parsing the PR file
+    diff_logic = None
+
     if lock_path.endswith("poetry.lock"):
         extract_logic = extract_poetry
+        diff_logic = _extract_toml_diff
     elif lock_path.endswith("uv.lock"):
         extract_logic = extract_uv
+        diff_logic = _extract_toml_diff
     elif lock_path.endswith("package-lock.json"):
         extract_logic = extract_npm
     elif lock_path.endswith("yarn.lock"):
@@ -160,20 +200,23 @@ def main() -> None:
         sys.exit(1)
 
     base_set = extract_logic(base_path)
-    pr_set = extract_logic(lock_path)
-    new_or_changed = pr_set - base_set
+    if diff_logic is not None:
+        new_or_changed = diff_logic(lock_path, base_set)
+    else:
+        new_or_changed = extract_logic(lock_path) - base_set
+
+    sorted_entries = sorted(new_or_changed)
 
+    # Every line keeps its trailing newline so the action's `while read` loop sees the last one
     with open("parsed_deps.txt", "w") as f:
-        for entry in sorted(new_or_changed):
-            name, version = entry.split("==")
-            f.write(f"{name} {version}\n")
+        f.write("".join(f"{name} {version}\n" for name, version in sorted_entries))
 
-    if not new_or_changed:
+    if not sorted_entries:
         print("No new or changed dependencies.")
     else:
         print("new or updated dependencies:")
-        for entry in sorted(new_or_changed):
-            print(f" - {entry}")
+        for name, version in sorted_entries:
+            print(f" - {name}=={version}")
 
 
 if __name__ == "__main__":
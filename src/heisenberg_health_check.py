@@ -1,14 +1,21 @@
 import argparse
 import math
+import re
 import requests
 import sys, os
 import urllib
 
-from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Any, Dict, Tuple
 
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
 sys.path.append(os.path.dirname(__file__))
-from npm_postinstall_detection import check_npm_postinstall
 
 parser = argparse.ArgumentParser(description="Check package info using deps.dev")
 parser.add_argument(
@@ -37,23 +44,85 @@ if PACKAGE_MANAGER not in SUPPORTED_MANAGERS:
 PACKAGE_NAME = args.pkg
 PACKAGE_VERSION = args.version
 BASE_URL = "https://api.deps.dev/v3"
+REQUEST_TIMEOUT = 10
+
+# Endpoint templates, filled with str.format by the fetch_* helpers
+_VERSION_URL = "{base}/systems/{pm}/packages/{name}/versions/{ver}"
+_DEPENDENTS_URL = "https://api.deps.dev/v3alpha/systems/{pm}/packages/{name}/versions/{ver}:dependents"
+_PROJECT_URL = "{base}/projects/{project}"
+_NPM_VERSION_URL = "https://registry.npmjs.org/{name}/{ver}"
+_PYPI_VERSION_URL = "https://pypi.org/pypi/{name}/{ver}/json"
+_GITHUB_REPO_URL = "https://api.github.com/repos/{repo}"
+
+# Seconds-resolution prefix of an ISO-8601 timestamp, e.g. 2024-01-31T12:00:00
+_ISO_UTC_PREFIX_RE = re.compile(r"\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d")
+
+HTTP_CACHE_PATH = os.environ.get("HEISENBERG_HTTP_CACHE", "")
+HTTP_CACHE_TTL = 3600
+HTTP_CACHE_TARBALL_TTL = 900
+
+# Shared session so repeated calls to the same host reuse the TCP/TLS connection.
+# When HEISENBERG_HTTP_CACHE is set, responses are also cached on disk so the
+# same package looked up again (report step, workflow re-runs) skips the network.
+# requests_cache is only imported when caching is enabled.
+SESSION = None
+if HTTP_CACHE_PATH:
+    try:
+        import requests_cache
+    except ImportError:
+        pass
+    else:
+        # npm tarballs are the largest payloads: keep them just long enough for the
+        # report step's re-run in the same job, so the next run's prune drops them
+        SESSION = requests_cache.CachedSession(
+            HTTP_CACHE_PATH,
+            backend="sqlite",
+            expire_after=HTTP_CACHE_TTL,
+            urls_expire_after={"registry.npmjs.org/*/-/": HTTP_CACHE_TARBALL_TTL},
+        )
+if SESSION is None:
+    SESSION = requests.Session()
+_adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8)
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
+
+
+# Package names and project ids recur across lookups, so memoize their encoding
+@lru_cache(maxsize=1024)
+def _quote(value: str) -> str:
+    return urllib.parse.quote(value, safe="")
 
-ENCODED_PACKAGE_NAME = urllib.parse.quote(PACKAGE_NAME, safe="")
 
+ENCODED_PACKAGE_NAME = _quote(PACKAGE_NAME)
 
+
+# The deps.dev lookups are memoized and return parsed data rather than a Response.
+# The action runs one process per package, so each lookup happens once and the
+# caches only pay off once several packages are checked in one process (a future
+# bulk mode). Cached dicts are shared between callers: treat them as read-only.
+@lru_cache(maxsize=1024)
 def fetch_version_data(
     base_url: str, package_manager: str, encoded_name: str, package_version: str
-) -> requests.Response:
-    return requests.get(
-        f"{base_url}/systems/{package_manager}/packages/{encoded_name}/versions/{package_version}"
+) -> Tuple[int, Dict[str, Any]]:
+    version_response = SESSION.get(
+        _VERSION_URL.format(
+            base=base_url, pm=package_manager, name=encoded_name, ver=package_version
+        ),
+        timeout=REQUEST_TIMEOUT,
     )
+    if version_response.status_code != 200:
+        return version_response.status_code, {}
+    return version_response.status_code, json_loads(version_response.content)
 
 
+@lru_cache(maxsize=1024)
 def fetch_dependents_count(package_manager: str, encoded_name: str, package_version: str) -> str:
-    dependents_url = f"https://api.deps.dev/v3alpha/systems/{package_manager}/packages/{encoded_name}/versions/{package_version}:dependents"
-    dependents_response = requests.get(dependents_url)
+    dependents_url = _DEPENDENTS_URL.format(
+        pm=package_manager, name=encoded_name, ver=package_version
+    )
+    dependents_response = SESSION.get(dependents_url, timeout=REQUEST_TIMEOUT)
     if dependents_response.status_code == 200:
-        return dependents_response.json().get("dependentCount", "N/A")
+        return json_loads(dependents_response.content).get("dependentCount", "N/A")
     return "N/A"
 
 
@@ -62,36 +131,48 @@ def fetch_npm_deprecated(
 ) -> str | None:
     if package_manager != "npm":
         return None
-    npm_url = f"https://registry.npmjs.org/{package_name}/{package_version}"
-    npm_resp = requests.get(npm_url)
+    npm_url = _NPM_VERSION_URL.format(name=package_name, ver=package_version)
+    npm_resp = SESSION.get(npm_url, timeout=REQUEST_TIMEOUT)
     if npm_resp.status_code == 200:
-        npm_data = npm_resp.json()
+        npm_data = json_loads(npm_resp.content)
         return npm_data.get("deprecated", None)
     else:
         return None
 
 
+# Normalised (lowercase) classifiers that mark a PyPI project as no longer maintained
+_INACTIVE_CLASSIFIERS = frozenset({"development status :: 7 - inactive"})
+
+
+# The version-scoped endpoint is used on purpose: /pypi/{name}/json also carries the
+# file listing of every release, which is far larger for long-lived packages.
+@lru_cache(maxsize=512)
+def fetch_pypi_classifiers(package_name: str, package_version: str) -> Tuple[str, ...]:
+    url = _PYPI_VERSION_URL.format(name=package_name, ver=package_version)
+    resp = SESSION.get(url, timeout=REQUEST_TIMEOUT)
+    if resp.status_code != 200:
+        return ()
+    data = json_loads(resp.content)
+    info = (data.get("info") if isinstance(data, dict) else None) or {}
+    classifiers = (info.get("classifiers") if isinstance(info, dict) else None) or []
+    return tuple(c for c in classifiers if isinstance(c, str))
+
+
 def fetch_pypi_deprecated(
     package_manager: str, package_name: str, package_version: str
 ) -> str | None:
     if package_manager != "pypi":
         return None
-    url = f"https://pypi.org/pypi/{package_name}/{package_version}/json"
     try:
-        resp = requests.get(url, timeout=10)
-        if resp.status_code != 200:
-            return None
-        data = resp.json()
-        info = data.get("info", {}) or {}
-        classifiers = info.get("classifiers", []) or []
-        for c in classifiers:
-            if c.strip().lower() == "development status :: 7 - inactive".lower():
-                return "Inactive/Deprecated (Development Status :: 7 - Inactive)"
-        return None
-    except Exception:
+        classifiers = fetch_pypi_classifiers(package_name, package_version)
+    except (requests.RequestException, ValueError):
         return None
+    if any(c.strip().lower() in _INACTIVE_CLASSIFIERS for c in classifiers):
+        return "Inactive/Deprecated (Development Status :: 7 - Inactive)"
+    return None
 
 
+@lru_cache(maxsize=1024)
 def fetch_project_data_with_github_fallback(
     base_url: str, project_id: str
 ) -> Tuple[Dict[str, Any], int, int]:
@@ -100,17 +181,17 @@ def fetch_project_data_with_github_fallback(
     forks = 0
     if not project_id:
         return project_data, stars, forks
-    project_url = f"{base_url}/projects/{urllib.parse.quote(project_id, safe='')}"
-    project_response = requests.get(project_url)
+    project_url = _PROJECT_URL.format(base=base_url, project=_quote(project_id))
+    project_response = SESSION.get(project_url, timeout=REQUEST_TIMEOUT)
     if project_response.status_code == 200:
-        return project_response.json(), stars, forks
+        return json_loads(project_response.content), stars, forks
     if project_id.startswith("github.com"):
         try:
             owner_repo = project_id.replace("github.com/", "")
-            gh_api_url = f"https://api.github.com/repos/{owner_repo}"
-            gh_resp = requests.get(gh_api_url)
+            gh_api_url = _GITHUB_REPO_URL.format(repo=owner_repo)
+            gh_resp = SESSION.get(gh_api_url, timeout=REQUEST_TIMEOUT)
             if gh_resp.status_code == 200:
-                gh_data = gh_resp.json()
+                gh_data = json_loads(gh_resp.content)
                 stars = gh_data.get("stargazers_count", 0)
                 forks = gh_data.get("forks_count", 0)
         except Exception:
@@ -118,62 +199,84 @@ def fetch_project_data_with_github_fallback(
     return project_data, stars, forks
 
 
+# Log-scale normalisation factors for the custom health score (log1p(x) * scale, capped at 10)
+_POP_SCALE = 10 / 2.5
+_DEP_SCALE = 10 / 10
+
+
+def _num(value: Any, default: float = 0.0) -> float:
+    # Checked up front rather than via float() + except, since "N/A" sentinels are common
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str) and value.replace(".", "", 1).isdecimal():
+        return float(value)
+    return default
+
+
 # HIGHLY EXPERIMENTAL and still requires further testing: 
 # Custom Health Score Calculator - add this to soften deps.dev score that could be too harsh. This score weighs higher into security rather than popularity.
-def compute_custom_health_score(parsed: Dict[str, Any]) -> float | str:
-    try:
-        stars = int(parsed["popularity_info_stars"])
-        forks = int(parsed["popularity_info_forks"])
-        maintained = (
-            float(parsed["maintenance_info"]) if parsed["maintenance_info"] != "N/A" else 0
-        )
-        vulnerabilities = (
-            float(parsed["security_score"]) if parsed["security_score"] != "N/A" else 0
-        )
-        dependents = int(parsed["dependents"]) if parsed["dependents"] != "N/A" else 0
+def compute_custom_health_score(parsed: Dict[str, Any]) -> float:
+    stars = _num(parsed.get("popularity_info_stars"))
+    forks = _num(parsed.get("popularity_info_forks"))
+    maintained = _num(parsed.get("maintenance_info"))
+    vulnerabilities = _num(parsed.get("security_score"))
+    dependents = _num(parsed.get("dependents"))
+
+    # Popularity log scale normalized
+    popularity_score = min(math.log1p(stars + forks) * _POP_SCALE, 10.0)
+
+    # Dependents log scale normalized
+    dependent_score = min(math.log1p(dependents) * _DEP_SCALE, 10.0)
+
+    # Final custom weighted health score
+    health_score = (
+        popularity_score * 0.25
+        + maintained * 0.2
+        + vulnerabilities * 0.3
+        + dependent_score * 0.25
+    )
+    computed = round(health_score, 1)
 
-        # Popularity log scale normalized
-        raw_pop = math.log1p(stars + forks)
-        popularity_score = min((raw_pop / 2.5) * 10, 10)
+    # Adjust based on package health score from deps.dev
+    package_score = _num(parsed.get("health_score"), math.nan)
+    if not math.isnan(package_score):
+        return round((package_score + computed) / 2, 1)
 
-        # Dependents log scale normalized
-        dependent_score = min((math.log1p(dependents) / 10) * 10, 10)
+    return computed
 
-        # Final custom weighted health score
-        health_score = (
-            popularity_score * 0.25
-            + maintained * 0.2
-            + vulnerabilities * 0.3
-            + dependent_score * 0.25
-        )
-        computed = round(health_score, 1)
 
-        # Adjust based on package health score from deps.dev
-        if parsed["health_score"] not in {"N/A", "Not Found"}:
-            try:
-                package_score = float(parsed["health_score"])
-                final_score = round((package_score + computed) / 2, 1)
-                return final_score
-            except ValueError:
-                pass
+def check_npm_postinstall_safe(package_name: str, package_version: str) -> Dict[str, Any]:
+    # Only npm lookups need the tarball inspection module
+    from npm_postinstall_detection import check_npm_postinstall
 
-        return computed
-    except Exception:
-        return "Unknown"
+    try:
+        return check_npm_postinstall(package_name, package_version, session=SESSION)
+    except Exception as e:
+        return {"has_postinstall": False, "lifecycle": [], "postinstall_cmd": "", "error": str(e)}
 
 
-version_response = fetch_version_data(
-    BASE_URL, PACKAGE_MANAGER, ENCODED_PACKAGE_NAME, PACKAGE_VERSION
-)
+# The lookups below are independent network calls, so issue them concurrently.
+# The deprecation check runs alongside the version lookup (as before, it is made
+# even for unknown versions); the rest only start once the version is known to exist.
+executor = ThreadPoolExecutor(max_workers=6)
 
+version_future = executor.submit(
+    fetch_version_data, BASE_URL, PACKAGE_MANAGER, ENCODED_PACKAGE_NAME, PACKAGE_VERSION
+)
 
-deprecated = None
+deprecated_future = None
 if PACKAGE_MANAGER == "npm":
-    deprecated = fetch_npm_deprecated(PACKAGE_MANAGER, PACKAGE_NAME, PACKAGE_VERSION)
+    deprecated_future = executor.submit(
+        fetch_npm_deprecated, PACKAGE_MANAGER, PACKAGE_NAME, PACKAGE_VERSION
+    )
 elif PACKAGE_MANAGER == "pypi":
-    deprecated = fetch_pypi_deprecated(PACKAGE_MANAGER, PACKAGE_NAME, PACKAGE_VERSION)
+    deprecated_future = executor.submit(
+        fetch_pypi_deprecated, PACKAGE_MANAGER, PACKAGE_NAME, PACKAGE_VERSION
+    )
+
+version_status, version_data = version_future.result()
 
-if version_response.status_code != 200:
+if version_status != 200:
     print(f"Package: {PACKAGE_NAME}")
     print(f"Version: {PACKAGE_VERSION}")
     print("Package Health Score: Not Found")
@@ -189,33 +292,38 @@ if version_response.status_code != 200:
     print("Fresh Publish (<24h): N/A")
     sys.exit(0)
 
-version_data = version_response.json()
 related_projects = version_data.get("relatedProjects", [])
 project_id = related_projects[0].get("projectKey", {}).get("id", "") if related_projects else ""
 
+project_future = executor.submit(fetch_project_data_with_github_fallback, BASE_URL, project_id)
+dependents_future = executor.submit(
+    fetch_dependents_count, PACKAGE_MANAGER, ENCODED_PACKAGE_NAME, PACKAGE_VERSION
+)
+npminfo_future = None
+if PACKAGE_MANAGER == "npm":
+    npminfo_future = executor.submit(check_npm_postinstall_safe, PACKAGE_NAME, PACKAGE_VERSION)
+
 advisory_keys = version_data.get("advisoryKeys", [])
 advisory_ids = [adv.get("id") for adv in advisory_keys]
 
 published_at_iso = version_data.get("publishedAt")
 fresh_flag = "N/A"
 if published_at_iso:
-    try:
-        dt = datetime.fromisoformat(published_at_iso.replace("Z", "+00:00"))
-        hours_old = (datetime.now(timezone.utc) - dt).total_seconds() / 3600.0
-        fresh_flag = "Yes" if hours_old < 24.0 else "No"
-    except Exception:
-        fresh_flag = "N/A"
-
-npminfo = None
-if PACKAGE_MANAGER == "npm":
-    try:
-        npminfo = check_npm_postinstall(PACKAGE_NAME, PACKAGE_VERSION)
-    except Exception as e:
-        npminfo = {"has_postinstall": False, "lifecycle": [], "postinstall_cmd": "", "error": str(e)}
-
-dependent_count = fetch_dependents_count(PACKAGE_MANAGER, ENCODED_PACKAGE_NAME, PACKAGE_VERSION)
-
-project_data, gh_stars, gh_forks = fetch_project_data_with_github_fallback(BASE_URL, project_id)
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=24)
+    if published_at_iso.endswith("Z") and _ISO_UTC_PREFIX_RE.match(published_at_iso):
+        # UTC ISO-8601 timestamps sort chronologically as strings, no parse needed
+        fresh_flag = "Yes" if published_at_iso[:19] > cutoff.strftime("%Y-%m-%dT%H:%M:%S") else "No"
+    else:
+        try:
+            fresh_flag = "Yes" if datetime.fromisoformat(published_at_iso) > cutoff else "No"
+        except (TypeError, ValueError):
+            fresh_flag = "N/A"
+
+deprecated = deprecated_future.result() if deprecated_future else None
+npminfo = npminfo_future.result() if npminfo_future else None
+dependent_count = dependents_future.result()
+project_data, gh_stars, gh_forks = project_future.result()
+executor.shutdown()
 
 scorecard = {check["name"]: check for check in project_data.get("scorecard", {}).get("checks", [])}
 
@@ -1,12 +1,15 @@
 import io, json, tarfile, urllib.parse, requests
 
-def fetch_npm_tarball_bytes(name: str, version: str, timeout=(15, 30)) -> bytes:
+def fetch_npm_tarball_bytes(
+    name: str, version: str, timeout=(15, 30), session: requests.Session | None = None
+) -> bytes:
+    http = session or requests
     safe = urllib.parse.quote(name, safe="")
     meta_url = f"https://registry.npmjs.org/{safe}/{version}"
-    m = requests.get(meta_url, timeout=timeout[0])
+    m = http.get(meta_url, timeout=timeout[0])
     m.raise_for_status()
     tarball_url = m.json()["dist"]["tarball"]
-    r = requests.get(tarball_url, timeout=timeout[1])
+    r = http.get(tarball_url, timeout=timeout[1])
     r.raise_for_status()
     return r.content
 
@@ -39,7 +42,7 @@ def detect_postinstall_scripts(pkg_json: dict) -> dict:
         "postinstall_cmd": scripts.get("postinstall", ""),
     }
 
-def check_npm_postinstall(name: str, version: str) -> dict:
+def check_npm_postinstall(name: str, version: str, session: requests.Session | None = None) -> dict:
     """
     High-level check used by Heisenberg:
       {
@@ -48,7 +51,7 @@ def check_npm_postinstall(name: str, version: str) -> dict:
         "postinstall_cmd": "..."
       }
     """
-    blob = fetch_npm_tarball_bytes(name, version)
+    blob = fetch_npm_tarball_bytes(name, version, session=session)
     pkg_json = extract_package_json_from_tarball(blob)
     if not pkg_json:
         return {"has_postinstall": False, "lifecycle": [], "postinstall_cmd": ""}